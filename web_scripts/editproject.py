@@ -57,6 +57,7 @@ def format_edit_project(project_id):
 def main():
     """Display the edit project interface.
     """
+    valutils.clear_project_cache()
     arguments = cgi.FieldStorage()
     project_id = formutils.safe_cgi_field_get(arguments, 'project_id')
 
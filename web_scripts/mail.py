@@ -1,10 +1,16 @@
+import atexit
+import os
 import smtplib
+import sys
+import syslog
+import time
+import traceback
 from email.mime.text import MIMEText
+from textwrap import dedent
 from xml.etree.ElementTree import Comment
 
 import db
 import creds
-from datetime import datetime
 from config import EXPIRATION_BY_NUM_DAYS
 
 APPROVERS_LIST = "sipb-projectdb-approvers@mit.edu"
@@ -16,8 +22,184 @@ AWAITING_APPROVAL_URL = "https://{locker}.scripts.mit.edu:444/projectlist.py?fil
 BASE_EDIT_URL = "https://{locker}.scripts.mit.edu:444/editproject.py?project_id=".format(locker=creds.user) #Need to provide project id at the end
 BASE_HISTORY_URL = "https://{locker}.scripts.mit.edu:444/projecthistory.py?project_id=".format(locker=creds.user) #Need to provide project id at the end
 
+SMTP_HOST = 'outgoing.mit.edu'
+SMTP_PORT = 25
+
+# Where failures to deliver messages sent in the background are recorded. This
+# is in the locker's home directory rather than web_scripts so that it is not
+# served to the web:
+MAIL_ERROR_LOG = os.path.expanduser('~/projectdb-mail-errors.log')
+
+# Connection to the SMTP server, shared by every message sent from this
+# process. Use _get_smtp() rather than accessing this directly.
+_smtp_singleton = None
+
+# Email bodies, formatted with str.format() when each message is sent. They
+# are dedented once here so that the sent messages are not indented:
+
+_APPROVERS_MSG = dedent("""
+    Dear SIPB Project Approvers,
+    
+    Project '{name}' has been submitted to the database by {creator} and is awaiting review.
+    
+    See the list of all projects that are awaiting approval here:
+    {url}
+    
+    This email was generated as of {time}.
+    
+    Sincerely,
+    SIPB ProjectDB service bot
+    """)
+
+_EDIT_NOTICE_MSG = dedent("""
+    Dear SIPB Project Approvers,
+    
+    Project '{name}' has been edited by {editor}. No action is required if the
+    following details are acceptable, otherwise edit the details using the URL
+    at the end of this message.
+
+    {info}
+    
+    Edit the project, if necessary, here:
+    {url}
+
+    You can also roll back to a previous state here:
+    {history_url}
+    
+    This email was generated as of {time}.
+    
+    Sincerely,
+    SIPB ProjectDB service bot
+    """)
+
+_APPROVE_MSG = dedent("""
+    Dear {name}'s project team,
+    
+    Congratulations! Your project submission to the SIPB projects website has been reviewed and approved by {approver}, with the following comment:
+    
+    "{comment}"
+    
+    You can now find your project on the list of all approved projects at:
+    {url}
+    
+    This email was generated as of {time}.
+    
+    Sincerely,
+    SIPB ProjectDB service bot
+    """)
+
+_REJECT_MSG = dedent("""
+    Dear {name}'s project team,
+    
+    Unfortunately, your project submission to the SIPB projects website has been rejected by {approver} with the following comments:
+    
+    "{comment}"
+    
+    You can edit your project using the following link:
+    {url}
+    
+    Please make the necessary changes to your project submission and resubmit for another review.
+    
+    This email was generated as of {time}.
+    
+    Sincerely,
+    SIPB ProjectDB service bot
+    """)
+
+_CONFIRM_REMINDER_MSG = dedent("""
+    Dear {name}'s project team,
+    
+    Per SIPB's policy, we require that project maintainers update their submitted project info at least every {policy_num_days} days make sure the information it contains is correct. The expiration date is calculated from the last time an edit was made to the project. We ask that you review the project information displayed on the SIPB projects website and make any edits as necessary.
+    
+    If you fail to renew the status of your project, of which you have {num_days} left, then your project will automatically be set to "inactive".
+    
+    You can edit your project using the following link:
+    {url}
+    
+    Note: If no edits are needed, you can simply change your project's status back to "active" and click "Update Project" for a new expiration timestamp to be generated.
+    
+    This email was generated as of {time}.
+    
+    Sincerely,
+    SIPB ProjectDB service bot
+    """)
+
+_DEACTIVATION_MSG = dedent("""
+    Dear {name}'s project team,
+    
+    This is a notice to let you know that your project has automatically been marked as "inactive" on the SIPB projects website. This is because your group has failed to update your project listing prior to the expiration data.
+    
+    Per SIPB's policy, we require that project maintainers update their submitted project info at least every {policy_num_days} days make sure the information it contains is correct. The expiration date is calculated from the last time an edit was made to the project.
+    
+    We ask that you review the project information displayed on the SIPB projects website and make any edits as necessary.
+    
+    You can edit your project using the following link:
+    {url}
+    
+    Note: If no edits are needed, you can simply change your project's status back to "active" and click "Update Project" for a new expiration timestamp to be generated.
+    
+    This email was generated as of {time}.
+    
+    Sincerely,
+    SIPB ProjectDB service bot
+    """)
+
+
+# Pieces of the project info included in the edit notice:
+
+_LINK_FMT = dedent("""
+    Link: {link}
+    Anchortext: {anchortext}
+
+    """)
+
+_COMM_CHANNEL_FMT = dedent("""
+    Channel: {channel}
+
+    """)
+
+_ROLE_FMT = dedent("""
+    Role: {role}
+    Description: {description}
+    Prereq: {prereq}
+    """)
+
+_CONTACT_FMT = dedent("""
+    Contact: {email}
+    Type: {type}
+    """)
+
+_PROJECT_INFO_FMT = dedent("""
+    Name: {name}
+
+    Description:
+    {description}
+
+    Status: {status}
+
+    Link(s):
+    {links}
+
+    Communications channel(s):
+    {comm_channels}
+
+    Role(s):
+    {roles}
+
+    Contact(s):
+    {contacts}
+    """)
+
+
 ## Helper function
 
+def format_current_time():
+    """Format the current local time for the "generated as of" line of each
+    message.
+    """
+    return time.strftime("%H:%M:%S on %m/%d/%Y", time.localtime())
+
+
 def get_point_of_contacts(project_info):
     """
     Given a project, return a list of strings of all the email contacts 
@@ -25,89 +207,50 @@ def get_point_of_contacts(project_info):
     """
     creator_email = db.get_project_creator(project_info['project_id']) + '@mit.edu'
     all_contacts = [creator_email]
+    seen = set([creator_email.lower()])
     for contact in project_info['contacts']:
-        if contact not in project_info['contacts']: #Avoid duplicates
+        if contact['email'].lower() not in seen: #Avoid duplicates
+            seen.add(contact['email'].lower())
             all_contacts.append(contact['email'])
     return all_contacts
 
 
 def format_project_links(links):
-    result = ''
-    for link in links:
-        result += """
-        Link: {link}
-        Anchortext: {anchortext}
-
-        """.format(
-            link=link['link'],
-            anchortext=link['anchortext']
-        )
-    return result
+    return ''.join(
+        _LINK_FMT.format(link=link['link'], anchortext=link['anchortext'])
+        for link in links
+    )
 
 
 def format_project_comm_channels(comm_channels):
-    result = ''
-    for channel in comm_channels:
-        result += """
-        Channel: {channel}
-
-        """.format(
-            channel=channel['commchannel']
-        )
-    return result
+    return ''.join(
+        _COMM_CHANNEL_FMT.format(channel=channel['commchannel'])
+        for channel in comm_channels
+    )
 
 
 def format_project_roles(roles):
-    result = ''
-    for role in roles:
-        result += """
-        Role: {role}
-        Description: {description}
-        Prereq: {prereq}
-        """.format(
+    return ''.join(
+        _ROLE_FMT.format(
             role=role['role'],
             description=role['description'],
             prereq=role['prereq']
         )
-    return result
+        for role in roles
+    )
 
 
 def format_project_contacts(contacts):
-    result = ''
-    for contact in contacts:
-        result += """
-        Contact: {email}
-        Type: {type}
-        """.format(
-            email=contact['email'],
-            type=contact['type']
-        )
-    return result
+    return ''.join(
+        _CONTACT_FMT.format(email=contact['email'], type=contact['type'])
+        for contact in contacts
+    )
 
 
 def format_project_info(project_info):
     """Format a string with all of the various project info.
     """
-    result = """
-    Name: {name}
-
-    Description:
-    {description}
-
-    Status: {status}
-
-    Link(s):
-    {links}
-
-    Communications channel(s):
-    {comm_channels}
-
-    Role(s):
-    {roles}
-
-    Contact(s):
-    {contacts}
-    """.format(
+    return _PROJECT_INFO_FMT.format(
         name=project_info['name'],
         description=project_info['description'],
         status=project_info['status'],
@@ -118,58 +261,150 @@ def format_project_info(project_info):
         roles=format_project_roles(project_info['roles']),
         contacts=format_project_contacts(project_info['contacts'])
     )
-    return result
 
 
 ## Main functionality
 
 
-def send(recipients, sender, subject, message):
+def _get_smtp():
+    """Get the shared SMTP connection, (re)connecting if it has not been
+    opened yet or the server has dropped it.
+
+    Returns:
+        smtplib.SMTP: An open connection to MIT's SMTP server
+    """
+    global _smtp_singleton
+    if _smtp_singleton is not None:
+        try:
+            code, _ = _smtp_singleton.noop()
+        except smtplib.SMTPServerDisconnected:
+            code = None
+        if code != 250:
+            _close_smtp()
+    if _smtp_singleton is None:
+        _smtp_singleton = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    return _smtp_singleton
+
+
+def _close_smtp():
+    """Close the shared SMTP connection, if one is open.
+    """
+    global _smtp_singleton
+    if _smtp_singleton is not None:
+        try:
+            _smtp_singleton.quit()
+        except smtplib.SMTPException:
+            _smtp_singleton.close()
+        _smtp_singleton = None
+
+
+atexit.register(_close_smtp)
+
+
+def _send_detached(sender, recipients, raw):
+    """Deliver a message from a forked child process, so that the caller (and
+    the CGI response it is producing) does not wait on the SMTP server. Falls
+    back to sending synchronously if the process cannot be forked.
+    """
+    global _smtp_singleton
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        pid = os.fork()
+    except OSError:
+        _get_smtp().sendmail(sender, recipients, raw)
+        return
+    if pid != 0:
+        return
+
+    # In the child: detach from the web server's pipes so the response is
+    # complete once the parent exits, and use a connection of our own.
+    exit_status = 1
+    try:
+        try:
+            os.setsid()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+            _smtp_singleton = None
+            _get_smtp().sendmail(sender, recipients, raw)
+            _close_smtp()
+            exit_status = 0
+        except Exception:
+            _log_send_failure(recipients, traceback.format_exc())
+    finally:
+        # Never return into the parent's code from the child:
+        os._exit(exit_status)
+
+
+def _log_send_failure(recipients, error):
+    """Record a failure to deliver a message sent in the background, since
+    there is no page to display it on. Falls back to syslog if the log file
+    cannot be written.
+
+    Args:
+        recipients (list[str]): The recipients of the message which failed
+        error (str): The formatted traceback of the failure
+    """
+    entry = 'Failed to send mail to %s at %s:\n%s\n' % (
+        ', '.join(recipients), format_current_time(), error
+    )
+    try:
+        with open(MAIL_ERROR_LOG, 'a') as log_file:
+            log_file.write(entry)
+    except (IOError, OSError):
+        syslog.syslog(syslog.LOG_ERR, 'projectdb: ' + entry)
+
+
+def send(recipients, sender, subject, message, background=False):
     """Send an unauthenticated email using MIT's SMTP server
 
+    All recipients are delivered in a single SMTP transaction (one MAIL FROM,
+    one RCPT TO per recipient, one DATA), so callers should pass every
+    recipient of a message at once rather than calling this once per address.
+
     Args:
         recipients (Sequence[str] | str): If one receipient, use a single string. Else use a list of strings.
         sender (str): Email of sender
         subject (str): Email subject
         message (str): Actual content of email
+        background (bool): If True, deliver from a detached child process and return immediately. Failures are logged to MAIL_ERROR_LOG.
     """
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    elif isinstance(recipients, (list, tuple)):
+        recipients = list(recipients)
+    else:
+        raise Exception("Email recipient neither a list or a string")
+
     msg = MIMEText(message)
     msg['Subject'] = subject
     msg['From'] = sender
-    if isinstance(recipients, str):
-        msg['To'] = recipients
-    elif isinstance(recipients, list):
-        msg['To'] = ','.join(recipients)
+    msg['To'] = ', '.join(recipients)
+    raw = msg.as_string()
+
+    if background:
+        _send_detached(sender, recipients, raw)
     else:
-        raise Exception("Email recipient neither a list or a string")
-    
-    s = smtplib.SMTP('outgoing.mit.edu', 25)
-    s.sendmail(sender, recipients, msg.as_string())
-    s.quit()
+        # sendmail() leaves the session ready for the next message on success,
+        # and issues its own RSET on failure, so no explicit reset is needed:
+        _get_smtp().sendmail(sender, recipients, raw)
 
 
-def send_to_approvers(project_info):
+def send_to_approvers(project_info, creator=None):
     """Send a message to the approver mailing list notifying that a project is
     ready for review.
+
+    If the kerberos of the project's creator is already known, pass it as
+    `creator` to avoid looking it up in the database.
     """
-    project_creator = db.get_project_creator(project_info['project_id'])
-    current_time = datetime.now().strftime("%H:%M:%S on %m/%d/%Y")
+    if creator is None:
+        creator = db.get_project_creator(project_info['project_id'])
+    current_time = format_current_time()
     subject = "[Action Required] SIPB project '{name}' needs approval".format(name=project_info['name'])
-    msg = """
-    Dear SIPB Project Approvers,
-    
-    Project '{name}' has been submitted to the database by {creator} and is awaiting review.
-    
-    See the list of all projects that are awaiting approval here:
-    {url}
-    
-    This email was generated as of {time}.
-    
-    Sincerely,
-    SIPB ProjectDB service bot
-    """.format(
+    msg = _APPROVERS_MSG.format(
         name=project_info['name'],
-        creator=project_creator,
+        creator=creator,
         time=current_time,
         url=AWAITING_APPROVAL_URL)
     
@@ -180,30 +415,11 @@ def send_edit_notice_to_approvers(project_info, editor_kerberos):
     """Send a message to the approver mailing list notifying that a project has
     been edited.
     """
-    current_time = datetime.now().strftime("%H:%M:%S on %m/%d/%Y")
+    current_time = format_current_time()
     subject = "[NOTICE] SIPB project '{name}' has been edited".format(
         name=project_info['name']
     )
-    msg = """
-    Dear SIPB Project Approvers,
-    
-    Project '{name}' has been edited by {editor}. No action is required if the
-    following details are acceptable, otherwise edit the details using the URL
-    at the end of this message.
-
-    {info}
-    
-    Edit the project, if necessary, here:
-    {url}
-
-    You can also roll back to a previous state here:
-    {history_url}
-    
-    This email was generated as of {time}.
-    
-    Sincerely,
-    SIPB ProjectDB service bot
-    """.format(
+    msg = _EDIT_NOTICE_MSG.format(
         name=project_info['name'],
         info=format_project_info(project_info),
         editor=editor_kerberos,
@@ -219,87 +435,41 @@ def send_approve_message(project_info, approver_kerberos, approver_comments):
     """Send a message to the project creator and points of contact indicating
     that the project has been accepted.
     """
-    current_time = datetime.now().strftime("%H:%M:%S on %m/%d/%Y")
+    current_time = format_current_time()
     subject = "SIPB project '{name}' has been approved".format(name=project_info['name'])
-    msg = """
-    Dear {name}'s project team,
-    
-    Congratulations! Your project submission to the SIPB projects website has been reviewed and approved by {approver}, with the following comment:
-    
-    \"{comment}\"
-    
-    You can now find your project on the list of all approved projects at:
-    {url}
-    
-    This email was generated as of {time}.
-    
-    Sincerely,
-    SIPB ProjectDB service bot
-    """.format(name=project_info['name'],
+    msg = _APPROVE_MSG.format(name=project_info['name'],
                url=ALL_PROJECTS_URL,
                time=current_time,
                approver=approver_kerberos,
                comment=approver_comments if approver_comments else "None")
     
     recipients = get_point_of_contacts(project_info) + [APPROVERS_LIST]
-    send(recipients,SERVICE_EMAIL,subject,msg)
+    send(recipients, SERVICE_EMAIL, subject, msg, background=True)
 
 
 def send_reject_message(project_info, approver_kerberos, approver_comments):
     """Send a message to the project creator and points of contact indicating
     that the project has been rejected.
     """
-    current_time = datetime.now().strftime("%H:%M:%S on %m/%d/%Y")
+    current_time = format_current_time()
     subject = "SIPB project '{name}' has been rejected".format(name=project_info['name'])
-    msg = """
-    Dear {name}'s project team,
-    
-    Unfortunately, your project submission to the SIPB projects website has been rejected by {approver} with the following comments:
-    
-    \"{comment}\"
-    
-    You can edit your project using the following link:
-    {url}
-    
-    Please make the necessary changes to your project submission and resubmit for another review.
-    
-    This email was generated as of {time}.
-    
-    Sincerely,
-    SIPB ProjectDB service bot
-    """.format(name=project_info['name'],
+    msg = _REJECT_MSG.format(name=project_info['name'],
                time=current_time,
                approver=approver_kerberos,
                url= BASE_EDIT_URL + str(project_info['project_id']),
                comment=approver_comments) # There *must* be a comment for rejection
     
     recipients = get_point_of_contacts(project_info) + [APPROVERS_LIST]
-    send(recipients,SERVICE_EMAIL,subject,msg)
+    send(recipients, SERVICE_EMAIL, subject, msg, background=True)
 
 
 def send_confirm_reminder_message(project_info,num_days_left):
     """Send a message to the project contact(s) reminding them to confirm the
     project details. 
     """
-    current_time = datetime.now().strftime("%H:%M:%S on %m/%d/%Y")
+    current_time = format_current_time()
     subject = "[ACTION NEEDED] SIPB project '{name}' needs to be renewed".format(name=project_info['name'])
-    msg = """
-    Dear {name}'s project team,
-    
-    Per SIPB's policy, we require that project maintainers update their submitted project info at least every {policy_num_days} days make sure the information it contains is correct. The expiration date is calculated from the last time an edit was made to the project. We ask that you review the project information displayed on the SIPB projects website and make any edits as necessary.
-    
-    If you fail to renew the status of your project, of which you have {num_days} left, then your project will automatically be set to "inactive".
-    
-    You can edit your project using the following link:
-    {url}
-    
-    Note: If no edits are needed, you can simply change your project's status back to "active" and click "Update Project" for a new expiration timestamp to be generated.
-    
-    This email was generated as of {time}.
-    
-    Sincerely,
-    SIPB ProjectDB service bot
-    """.format(name=project_info['name'],
+    msg = _CONFIRM_REMINDER_MSG.format(name=project_info['name'],
                time=current_time,
                policy_num_days=EXPIRATION_BY_NUM_DAYS,
                num_days=num_days_left,
@@ -314,27 +484,9 @@ def send_deactivation_message(project_info):
     project's status has been set to "inactive" and will no longer appear on
     the list of active projects.
     """
-    current_time = datetime.now().strftime("%H:%M:%S on %m/%d/%Y")
+    current_time = format_current_time()
     subject = "[NOTICE] SIPB project '{name}' has been marked as inactive".format(name=project_info['name'])
-    msg = """
-    Dear {name}'s project team,
-    
-    This is a notice to let you know that your project has automatically been marked as "inactive" on the SIPB projects website. This is because your group has failed to update your project listing prior to the expiration data.
-    
-    Per SIPB's policy, we require that project maintainers update their submitted project info at least every {policy_num_days} days make sure the information it contains is correct. The expiration date is calculated from the last time an edit was made to the project.
-    
-    We ask that you review the project information displayed on the SIPB projects website and make any edits as necessary.
-    
-    You can edit your project using the following link:
-    {url}
-    
-    Note: If no edits are needed, you can simply change your project's status back to "active" and click "Update Project" for a new expiration timestamp to be generated.
-    
-    This email was generated as of {time}.
-    
-    Sincerely,
-    SIPB ProjectDB service bot
-    """.format(name=project_info['name'],
+    msg = _DEACTIVATION_MSG.format(name=project_info['name'],
                time=current_time,
                policy_num_days=EXPIRATION_BY_NUM_DAYS,
                url= BASE_EDIT_URL + str(project_info['project_id'])) 
@@ -53,7 +53,9 @@ def main():
                 'moderators for approval. You will be notified once the '
                 'posting has been reviewed.'
             )
-            mail.send_to_approvers(project_info)
+            mail.send_to_approvers(
+                project_info, creator=requestor_kerberos
+            )
         else:
             message = None
 
@@ -18,6 +18,7 @@ cgitb.enable()
 
 
 def main():
+    valutils.clear_project_cache()
     arguments = cgi.FieldStorage()
     project_info = formutils.args_to_dict(arguments)
     project_id = formutils.safe_cgi_field_get(arguments, 'project_id')
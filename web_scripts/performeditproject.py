@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+
 import performutils
 
-# TODO: May want to turn error listing off once stable?
-import cgitb
-cgitb.enable()
+# Only show tracebacks in the browser when debugging, since importing cgitb
+# and installing its hook adds to the startup time of every request:
+if os.environ.get('PROJECTDB_DEBUG'):
+    import cgitb
+    cgitb.enable()
 
 
 def main():
@@ -28,7 +28,8 @@ def check_for_name_change(project_info, project_id):
         matches the name in the database.
     """
     return (
-        project_info['name'].lower() != db.get_project_name(project_id).lower()
+        project_info['name'].lower() !=
+        valutils.get_project_name(project_id).lower()
     )
 
 
@@ -236,12 +237,15 @@ def format_failure_page(status, operation):
 
 
 def edit_confirm_main(task):
+    valutils.clear_project_cache()
     arguments = cgi.FieldStorage()
-    project_info = formutils.args_to_dict(arguments)
     project_id = formutils.safe_cgi_field_get(arguments, 'project_id')
     editor_kerberos = authutils.get_kerberos()
     is_ok, status_messages = valutils.validate_project_id(project_id)
     if is_ok:
+        # Only parse the rest of the form once we know there is a project to
+        # apply it to:
+        project_info = formutils.args_to_dict(arguments)
         is_ok, status_messages = valutils.validate_edit_project(
             project_info, project_id
         )
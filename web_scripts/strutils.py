@@ -70,14 +70,9 @@ def html_listify(items):
     result : str
         The HTML list.
     """
-    items = [
-        cgi.escape(item, quote=True) for item in items
-    ]
-    result = '<ul>\n'
-    for item in items:
-        result += '    <li>%s</li>\n' % item
-    result += '</ul>\n'
-    return result
+    return '<ul>\n%s</ul>\n' % ''.join(
+        '    <li>%s</li>\n' % cgi.escape(item, quote=True) for item in items
+    )
 
 
 def is_mit_email(email):
@@ -100,6 +95,31 @@ def is_mit_email(email):
     return email.lower().endswith('mit.edu') and (email.count('@') == 1)
 
 
+def classify_mit_email(email):
+    """Check whether a given string is an MIT email address and, if so,
+    whether it is of the form *@mit.edu. The second check is skipped for
+    addresses which are not MIT addresses.
+
+    NOTE: only checks the ending -- does not actually check if this is a valid
+    address!
+
+    Parameters
+    ----------
+    email : str
+        The email address to check.
+
+    Returns
+    -------
+    is_mit : bool
+        Whether or not the address is an MIT address (see is_mit_email).
+    is_plain_mit : bool
+        Whether or not the address is of the form *@mit.edu (see
+        is_plain_mit_email).
+    """
+    is_mit = is_mit_email(email)
+    return is_mit, is_mit and is_plain_mit_email(email)
+
+
 def is_plain_mit_email(email):
     """Check whether a given string is an MIT email address of the form
     *@mit.edu.
@@ -120,6 +140,27 @@ def is_plain_mit_email(email):
     return email.lower().endswith('@mit.edu') and (email.count('@') == 1)
 
 
+def has_n_words(text, n):
+    """Check whether a string contains at least n whitespace-separated words.
+
+    Only the first n words are split off, so the cost does not grow with the
+    number of words in the string.
+
+    Parameters
+    ----------
+    text : str
+        The string to check.
+    n : int
+        The minimum number of words. Must be at least 1.
+
+    Returns
+    -------
+    has_n_words : bool
+        Whether or not the string has at least n words.
+    """
+    return len(text.split(None, n - 1)) >= n
+
+
 def make_url_absolute(url):
     """Make a URL absolute (with HTTP scheme), if it is not an HTTP/HTTPS URL
     already.
@@ -34,6 +34,59 @@ class Test_all_unique(unittest.TestCase):
         self.assertFalse(result)
 
 
+class Test_run_validators(unittest.TestCase):
+    def test_empty(self):
+        is_ok, status_messages = valutils.run_validators([])
+        self.assertTrue(is_ok)
+        self.assertEqual(len(status_messages), 0)
+
+    def test_valid(self):
+        is_ok, status_messages = valutils.run_validators([
+            (valutils.validate_project_name_text, ('test3',)),
+            (valutils.validate_project_description, ('one two three',)),
+        ])
+        self.assertTrue(is_ok)
+        self.assertEqual(len(status_messages), 0)
+
+    def test_invalid(self):
+        is_ok, status_messages = valutils.run_validators([
+            (valutils.validate_project_name_text, ('',)),
+            (valutils.validate_project_description, ('one two three',)),
+            (valutils.validate_project_roles_len, ([],)),
+        ])
+        self.assertFalse(is_ok)
+        self.assertEqual(len(status_messages), 2)
+
+
+class Test_get_project_name(testutils.DatabaseWipeTestCase):
+    def test_uncached(self):
+        project_id = db.get_project_id('test1')
+        project_name = valutils.get_project_name(str(project_id))
+        self.assertEqual(project_name, 'test1')
+
+    def test_cached(self):
+        project_id = db.get_project_id('test1')
+        is_ok, status_messages = valutils.validate_project_id_exists(
+            project_id
+        )
+        self.assertTrue(is_ok)
+
+        def fail_get_project_name(project_id):
+            raise AssertionError('db.get_project_name was called')
+
+        original_get_project_name = db.get_project_name
+        db.get_project_name = fail_get_project_name
+        try:
+            project_name = valutils.get_project_name(str(project_id))
+        finally:
+            db.get_project_name = original_get_project_name
+        self.assertEqual(project_name, 'test1')
+
+    def test_missing(self):
+        project_name = valutils.get_project_name('-1')
+        self.assertIsNone(project_name)
+
+
 class Test_validate_add_permission(testutils.EnvironmentOverrideTestCase):
     def test_none(self):
         os.environ.pop('SSL_CLIENT_S_DN_Email', None)
@@ -246,6 +299,28 @@ class Test_validate_project_contact_addresses(unittest.TestCase):
         self.assertFalse(is_ok)
         self.assertGreaterEqual(len(status_messages), 1)
 
+    def test_message_order(self):
+        # Messages are reported contact by contact, in the order given:
+        long_email = ('A' * 100) + '@mit.edu'
+        is_ok, status_messages = valutils.validate_project_contact_addresses(
+            [
+                {
+                    'email': long_email,
+                    'type': 'primary',
+                    'index': 0
+                },
+                {
+                    'email': 'foo@bar.com',
+                    'type': 'secondary',
+                    'index': 1
+                }
+            ]
+        )
+        self.assertFalse(is_ok)
+        self.assertEqual(len(status_messages), 2)
+        self.assertIn(long_email, status_messages[0])
+        self.assertIn('foo@bar.com', status_messages[1])
+
 
 class Test_validate_project_contacts_unique(unittest.TestCase):
     def test_unique(self):
@@ -701,6 +776,38 @@ class Test_validate_project_info(testutils.DatabaseWipeTestCase):
         self.assertFalse(is_ok)
         self.assertGreaterEqual(len(status_messages), 1)
 
+    def test_taken_name_invalid_description(self):
+        # The name availability check (a database query) is skipped when
+        # other fields are invalid, so only the description error is reported:
+        project_info = {
+            'name': 'test1',
+            'description': 'short',
+            'status': 'active',
+            'links': [],
+            'comm_channels': [],
+            'contacts': [
+                {
+                    'email': 'foo@mit.edu',
+                    'type': 'primary',
+                    'index': 0
+                }
+            ],
+            'roles': [
+                {
+                    'role': 'foo',
+                    'description': 'bar',
+                    'prereq': '',
+                    'index': 0
+                }
+            ]
+        }
+        is_ok, status_messages = valutils.validate_project_info(project_info)
+        self.assertFalse(is_ok)
+        self.assertEqual(
+            status_messages,
+            ['Project description must have at least three words!']
+        )
+
 
 class Test_validate_add_project(
     testutils.EnvironmentOverrideDatabaseWipeTestCase
@@ -982,7 +1089,7 @@ class Test_validate_approve_project(
                 ]
             }
             project_id = db.get_project_id(project_info['name'])
-            approval_action = 'accepted'
+            approval_action = 'approved'
             approver_comments = ''
             is_ok, status_messages = valutils.validate_approve_project(
                 project_info, project_id, approval_action, approver_comments
@@ -1012,7 +1119,7 @@ class Test_validate_approve_project(
             ]
         }
         project_id = db.get_project_id(project_info['name'])
-        approval_action = 'accepted'
+        approval_action = 'approved'
         approver_comments = ''
         is_ok, status_messages = valutils.validate_approve_project(
             project_info, project_id, approval_action, approver_comments
@@ -1020,6 +1127,45 @@ class Test_validate_approve_project(
         self.assertFalse(is_ok)
         self.assertGreaterEqual(len(status_messages), 1)
 
+    def test_invalid_action(self):
+        if len(config.ADMIN_USERS) > 0:
+            os.environ['SSL_CLIENT_S_DN_Email'] = \
+                config.ADMIN_USERS[0] + '@mit.edu'
+            project_info = {
+                'name': 'test1',
+                'description': 'some test description',
+                'status': 'active',
+                'links': [],
+                'comm_channels': [],
+                'contacts': [
+                    {'email': 'foo@mit.edu', 'type': 'primary', 'index': 0}
+                ],
+                'roles': [
+                    {
+                        'role': 'foo',
+                        'description': 'bar',
+                        'prereq': '',
+                        'index': 0
+                    }
+                ]
+            }
+            project_id = db.get_project_id(project_info['name'])
+            approval_action = 'accepted'
+            approver_comments = ''
+            is_ok, status_messages = valutils.validate_approve_project(
+                project_info, project_id, approval_action, approver_comments
+            )
+            self.assertFalse(is_ok)
+            self.assertEqual(len(status_messages), 1)
+
+
+class Test_parse_id(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(valutils.parse_id('1'), 1)
+
+    def test_invalid(self):
+        self.assertIsNone(valutils.parse_id('a'))
+
 
 class Test_validate_id_is_int(unittest.TestCase):
     def test_valid(self):
@@ -1043,7 +1189,7 @@ class Test_validate_project_id_exists(testutils.DatabaseWipeTestCase):
         self.assertEqual(len(status_messages), 0)
 
     def test_invalid(self):
-        project_id = '-99'
+        project_id = -99
         project_name = db.get_project_name(project_id)
         self.assertTrue(project_name is None)
         is_ok, status_messages = valutils.validate_project_id_exists(
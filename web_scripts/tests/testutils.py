@@ -18,6 +18,7 @@ import unittest
 
 import db
 import schema
+import valutils
 
 
 def restore_env(key, value):
@@ -88,6 +89,7 @@ class DatabaseWiper(object):
         schema.session.query(schema.Projects).delete()
 
         schema.session.commit()
+        valutils.clear_project_cache()
 
     def __enter__(self):
         self.drop_test_projects()
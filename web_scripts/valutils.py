@@ -13,6 +13,41 @@ import strutils
 # Functions which do NOT start with "validate_" are helper functions, and do
 # not need to adhere to the interface defined above.
 
+# Projects looked up by validate_project_id_exists, keyed by integer project
+# ID, so that later validation in the same request can reuse them instead of
+# querying the database again. Call clear_project_cache() at the start of each
+# request.
+_project_cache = {}
+
+INVALID_ID_MESSAGE = '"%s" is not a valid project ID!'
+
+
+def clear_project_cache():
+    """Forget all projects remembered by validate_project_id_exists.
+    """
+    _project_cache.clear()
+
+
+def get_project_name(project_id):
+    """Get the name of the project with the given ID, using the project
+    remembered by validate_project_id_exists if there is one.
+
+    Parameters
+    ----------
+    project_id : str or int
+        The project ID.
+
+    Returns
+    -------
+    name : str or None
+        The name of the project, or None if it does not exist.
+    """
+    project_id = int(project_id)
+    if project_id in _project_cache:
+        return _project_cache[project_id]['name']
+    else:
+        return db.get_project_name(project_id)
+
 
 def all_unique(vals, ignore_case=True):
     """Check if all entries in a list are unique.
@@ -34,6 +69,32 @@ def all_unique(vals, ignore_case=True):
     return len(set(vals)) == len(vals)
 
 
+def run_validators(validators):
+    """Run several validators and combine their results.
+
+    Parameters
+    ----------
+    validators : list of tuple
+        Each entry is a (validator, args) pair, where validator is a
+        "validate_" function and args is the tuple of positional arguments to
+        call it with.
+
+    Returns
+    -------
+    is_ok : bool
+        Whether or not all of the validations were passed.
+    status_messages : list of str
+        The status messages from all of the validators, in order.
+    """
+    is_ok = True
+    status_messages = []
+    for validator, args in validators:
+        validator_ok, validator_msgs = validator(*args)
+        is_ok &= validator_ok
+        status_messages.extend(validator_msgs)
+    return is_ok, status_messages
+
+
 def validate_add_permission():
     """Check if the user has permission to add projects.
 
@@ -107,6 +168,25 @@ def validate_project_name_available(name):
         return True, []
 
 
+def is_name_change(name, previous_name=None):
+    """Check if a project name differs (ignoring case) from the project's
+    previous name, and hence needs to be checked for availability.
+
+    Parameters
+    ----------
+    name : str
+        The proposed project name.
+    previous_name : str, optional
+        The previous name of the project (if this is an edit and not an add).
+
+    Returns
+    -------
+    is_change : bool
+        Whether or not the name is new.
+    """
+    return (previous_name is None) or (name.lower() != previous_name.lower())
+
+
 def validate_project_name(name, previous_name=None):
     """Check if the project name field is valid.
 
@@ -130,8 +210,11 @@ def validate_project_name(name, previous_name=None):
     name_text_ok, name_msgs = validate_project_name_text(name)
     name_ok &= name_text_ok
     status_messages.extend(name_msgs)
+    if not name_text_ok:
+        # Don't bother querying the database for a name that can't be used:
+        return name_ok, status_messages
 
-    if (previous_name is None) or (name.lower() != previous_name.lower()):
+    if is_name_change(name, previous_name):
         name_available, name_msgs = validate_project_name_available(name)
         name_ok &= name_available
         status_messages.extend(name_msgs)
@@ -154,7 +237,7 @@ def validate_project_description(description):
     status_messages : list of str
         A list of status messages.
     """
-    description_ok = len(description.split()) >= 3
+    description_ok = strutils.has_n_words(description, 3)
     if description_ok:
         status_messages = []
     else:
@@ -205,36 +288,32 @@ def validate_project_contact_addresses(contacts):
     """
     max_len = schema.ContactEmails.__table__.columns['email'].type.length
 
-    is_ok = True
     status_messages = []
 
     contains_plain_mit = False
     for contact in contacts:
-        if not strutils.is_mit_email(contact['email']):
-            is_ok = False
+        email = contact['email']
+        is_mit, is_plain_mit = strutils.classify_mit_email(email)
+        if not is_mit:
             status_messages.append(
-                '"%s" is not an mit.edu email address!' % contact['email']
+                '"%s" is not an mit.edu email address!' % email
             )
 
-        if len(contact['email']) > max_len:
-            is_ok = False
+        if len(email) > max_len:
             status_messages.append(
-                '"%s" is too long (%d character limit)!' % (
-                    contact['email'], max_len
-                )
+                '"%s" is too long (%d character limit)!' % (email, max_len)
             )
 
-        if strutils.is_plain_mit_email(contact['email']):
-            contains_plain_mit = True
+        contains_plain_mit |= is_plain_mit
 
     if not contains_plain_mit:
-        is_ok = False
         status_messages.append(
             'At least one contact must have an email address of the form '
             '"<username>@mit.edu" (otherwise no contacts will be able to edit '
             'project info).'
         )
 
+    is_ok = len(status_messages) == 0
     return is_ok, status_messages
 
 
@@ -340,21 +419,16 @@ def validate_project_role_fields(roles):
     """
     max_len = schema.Roles.__table__.columns['role'].type.length
 
-    is_ok = True
-    status_messages = []
     for role in roles:
-        if (len(role['role']) == 0) or (len(role['description']) == 0):
-            is_ok = False
-            status_messages = ['Each role must have a name and a description!']
-            break
+        if not role['role'] or not role['description']:
+            return False, ['Each role must have a name and a description!']
 
         if len(role['role']) > max_len:
-            is_ok = False
-            status_messages = [
+            return False, [
                 'Role names can be no longer than %d characters!' % max_len
             ]
-            break
-    return is_ok, status_messages
+
+    return True, []
 
 
 def validate_project_roles_unique(roles):
@@ -396,22 +470,11 @@ def validate_project_roles(roles):
     status_messages : list of str
         A list of status messages.
     """
-    is_ok = True
-    status_messages = []
-
-    len_ok, len_msgs = validate_project_roles_len(roles)
-    is_ok &= len_ok
-    status_messages.extend(len_msgs)
-
-    fields_ok, fields_msgs = validate_project_role_fields(roles)
-    is_ok &= fields_ok
-    status_messages.extend(fields_msgs)
-
-    unique_ok, unique_msgs = validate_project_roles_unique(roles)
-    is_ok &= unique_ok
-    status_messages.extend(unique_msgs)
-
-    return is_ok, status_messages
+    return run_validators([
+        (validate_project_roles_len, (roles,)),
+        (validate_project_role_fields, (roles,)),
+        (validate_project_roles_unique, (roles,)),
+    ])
 
 
 def validate_project_links(links):
@@ -481,40 +544,21 @@ def validate_project_info(project_info, previous_name=None):
     status_messages : list of str
         A list of status messages indicating the result of the validation.
     """
-    is_ok = True
-    status_messages = []
-
-    name_ok, name_msgs = validate_project_name(
-        project_info['name'], previous_name=previous_name
-    )
-    is_ok &= name_ok
-    status_messages.extend(name_msgs)
-
-    description_ok, description_msgs = validate_project_description(
-        project_info['description']
-    )
-    is_ok &= description_ok
-    status_messages.extend(description_msgs)
-
-    contacts_ok, contacts_msgs = validate_project_contacts(
-        project_info['contacts']
-    )
-    is_ok &= contacts_ok
-    status_messages.extend(contacts_msgs)
-
-    roles_ok, roles_msgs = validate_project_roles(project_info['roles'])
-    is_ok &= roles_ok
-    status_messages.extend(roles_msgs)
-
-    links_ok, links_msgs = validate_project_links(project_info['links'])
-    is_ok &= links_ok
-    status_messages.extend(links_msgs)
-
-    comms_ok, comms_msgs = validate_project_comm_channels(
-        project_info['comm_channels']
-    )
-    is_ok &= comms_ok
-    status_messages.extend(comms_msgs)
+    is_ok, status_messages = run_validators([
+        (validate_project_name_text, (project_info['name'],)),
+        (validate_project_description, (project_info['description'],)),
+        (validate_project_contacts, (project_info['contacts'],)),
+        (validate_project_roles, (project_info['roles'],)),
+        (validate_project_links, (project_info['links'],)),
+        (validate_project_comm_channels, (project_info['comm_channels'],)),
+    ])
+
+    # Checking that the name is available requires a database query, so only
+    # do so once everything else has passed:
+    if is_ok and is_name_change(project_info['name'], previous_name):
+        is_ok, status_messages = validate_project_name_available(
+            project_info['name']
+        )
 
     # TODO: this currently allows links, comm channels, and roles to be empty.
     # Do we want to require any of those at project creation time?
@@ -541,18 +585,13 @@ def validate_add_project(project_info):
     status_messages : list of str
         A list of status messages indicating the result of the validation.
     """
-    is_ok = True
-    status_messages = []
+    is_ok, status_messages = validate_add_permission()
+    if not is_ok:
+        # No point in checking (and querying the database for) the details of
+        # a project the user is not allowed to add:
+        return is_ok, status_messages
 
-    permission_ok, permission_msgs = validate_add_permission()
-    is_ok &= permission_ok
-    status_messages.extend(permission_msgs)
-
-    info_ok, info_msgs = validate_project_info(project_info)
-    is_ok &= info_ok
-    status_messages.extend(info_msgs)
-
-    return is_ok, status_messages
+    return validate_project_info(project_info)
 
 
 def validate_edit_permission(project_id):
@@ -599,21 +638,12 @@ def validate_edit_project(project_info, project_id):
     status_messages : list of str
         A list of status messages indicating the result of the validation.
     """
-    is_ok = True
-    status_messages = []
+    is_ok, status_messages = validate_edit_permission(project_id)
+    if not is_ok:
+        return is_ok, status_messages
 
-    permission_ok, permission_msgs = validate_edit_permission(project_id)
-    is_ok &= permission_ok
-    status_messages.extend(permission_msgs)
-
-    previous_name = db.get_project_name(project_id)
-    info_ok, info_msgs = validate_project_info(
-        project_info, previous_name=previous_name
-    )
-    is_ok &= info_ok
-    status_messages.extend(info_msgs)
-
-    return is_ok, status_messages
+    previous_name = get_project_name(project_id)
+    return validate_project_info(project_info, previous_name=previous_name)
 
 
 def validate_approval_permission():
@@ -678,7 +708,7 @@ def validate_approval_comments(approval_action, approver_comments):
         A list of status messages.
     """
     if approval_action == 'rejected':
-        is_ok = len(approver_comments.split()) >= 3
+        is_ok = strutils.has_n_words(approver_comments, 3)
     else:
         is_ok = True
 
@@ -717,29 +747,35 @@ def validate_approve_project(
     status_messages : list of str
         A list of status messages indicating the result of the validation.
     """
-    is_ok = True
-    status_messages = []
+    is_ok, status_messages = validate_approval_permission()
+    if not is_ok:
+        return is_ok, status_messages
 
-    permission_ok, permission_msgs = validate_approval_permission()
-    is_ok &= permission_ok
-    status_messages.extend(permission_msgs)
+    previous_name = get_project_name(project_id)
+    return run_validators([
+        (validate_project_info, (project_info, previous_name)),
+        (validate_approval_action, (approval_action,)),
+        (validate_approval_comments, (approval_action, approver_comments)),
+    ])
 
-    previous_name = db.get_project_name(project_id)
-    info_ok, info_msgs = validate_project_info(
-        project_info, previous_name=previous_name
-    )
-    is_ok &= info_ok
-    status_messages.extend(info_msgs)
 
-    action_ok, action_msgs = validate_approval_action(approval_action)
+def parse_id(id_):
+    """Interpret an ID as an int.
 
-    comments_ok, comments_msgs = validate_approval_comments(
-        approval_action, approver_comments
-    )
-    is_ok &= comments_ok
-    status_messages.extend(comments_msgs)
+    Parameters
+    ----------
+    id_ : str or int
+        The ID to parse. Assumed to be a string coming from a CGI form.
 
-    return is_ok, status_messages
+    Returns
+    -------
+    id_int : int or None
+        The ID as an int, or None if it is not interpretable as an int.
+    """
+    try:
+        return int(id_)
+    except ValueError:
+        return None
 
 
 def validate_id_is_int(id_):
@@ -757,10 +793,8 @@ def validate_id_is_int(id_):
     status_messages : list of str
         A list of status messages.
     """
-    try:
-        id_ = int(id_)
-    except ValueError:
-        return False, ['"%s" is not a valid project ID!' % id_]
+    if parse_id(id_) is None:
+        return False, [INVALID_ID_MESSAGE % id_]
     else:
         return True, []
 
@@ -770,8 +804,8 @@ def validate_project_id_exists(project_id):
 
     Parameters
     ----------
-    project_id : str
-        The project ID to check. Assumed to be a string coming from a CGI form.
+    project_id : int
+        The project ID to check, as parsed by parse_id.
 
     Returns
     -------
@@ -780,7 +814,6 @@ def validate_project_id_exists(project_id):
     status_messages : list of str
         A list of status messages.
     """
-    project_id = int(project_id)
     project_info = db.get_project(project_id)
     if len(project_info) == 0:
         is_ok = False
@@ -788,6 +821,7 @@ def validate_project_id_exists(project_id):
     elif len(project_info) == 1:
         is_ok = True
         status_messages = []
+        _project_cache[project_id] = project_info[0]
     else:
         is_ok = False
         status_messages = [
@@ -814,19 +848,11 @@ def validate_project_id(project_id):
     status_messages : list of str
         A list of status messages.
     """
-    is_ok = True
-    status_messages = []
+    parsed_id = parse_id(project_id)
+    if parsed_id is None:
+        return False, [INVALID_ID_MESSAGE % project_id]
 
-    is_int, is_int_status = validate_id_is_int(project_id)
-    is_ok &= is_int
-    status_messages.extend(is_int_status)
-
-    if is_int:
-        is_project, is_project_status = validate_project_id_exists(project_id)
-        is_ok &= is_project
-        status_messages.extend(is_project_status)
-
-    return is_ok, status_messages
+    return validate_project_id_exists(parsed_id)
 
 
 def validate_revision_id_exists(project_id, revision_id):